@@ -4,6 +4,7 @@ import math
 from random import choice, randint, random, seed
 from typing import Iterator, NamedTuple
 from dataclasses import dataclass
+from functools import lru_cache
 import svg
 
 
@@ -16,6 +17,22 @@ def random_float(start: float, end: float) -> float:
     return start + random() * (end - start)
 
 
+@lru_cache(maxsize=None)
+def unit_circle(n_points: int) -> tuple[tuple[float, float], ...]:
+    """Cos and sin of each of the n_points equally spaced angles.
+    """
+    angle_step = math.pi * 2 / n_points  # step used to place each point at equal distances
+    return tuple(
+        (math.cos(point_number * angle_step), math.sin(point_number * angle_step))
+        for point_number in range(1, n_points + 1)
+    )
+
+
+@lru_cache(maxsize=None)
+def hsl(hue: int, saturation: int, lightness: int) -> str:
+    return f'hsl({hue}, {saturation}%, {lightness}%)'
+
+
 @dataclass
 class Palette:
     primary: str
@@ -28,9 +45,9 @@ class Palette:
         saturation = randint(75, 100)
         lightness = randint(75, 95)
         return cls(
-            primary=f'hsl({hue}, {saturation}%, {lightness}%)',
-            dark=f'hsl({hue}, {saturation}%, 2%)',
-            light=f'hsl({hue}, {saturation}%, 98%)',
+            primary=hsl(hue, saturation, lightness),
+            dark=hsl(hue, saturation, 2),
+            light=hsl(hue, saturation, 98),
         )
 
 
@@ -52,17 +69,25 @@ class Generator:
     def cy(self) -> int:
         return self.height // 2
 
-    def generate_grid(self, size_x: int, size_y: int) -> svg.SVG:
+    def generate_grid(self, size_x: int, size_y: int, identical: bool = False) -> svg.SVG:
         if size_x == 1 and size_y == 1:
             return self.generate()
         elements: list[svg.Element] = []
+        if identical:
+            # draw the blob once and reference it from every tile
+            elements.append(svg.Defs(elements=[
+                svg.G(id='blob', elements=list(self.iter_elements())),
+            ]))
         for ix in range(size_x):
             x = self.width * ix
             for iy in range(size_y):
-                y = self.width * iy
+                y = self.height * iy
+                if identical:
+                    elements.append(svg.Use(href='#blob', x=x, y=y))
+                    continue
                 elements.append(svg.G(
                     transform=[svg.Translate(x, y)],
-                    elements=[self.generate()],
+                    elements=list(self.iter_elements()),
                 ))
         return svg.SVG(
             width=self.width * size_x,
@@ -96,34 +121,32 @@ class Generator:
 
     def iter_body_points(self, size: int) -> Iterator[Point]:
         n_points = randint(3, 12)   # how many points do we want?
-        angle_step = math.pi * 2 / n_points  # step used to place each point at equal distances
-        for point_number in range(1, n_points + 1):
+        for cos, sin in unit_circle(n_points):
             pull = random_float(.75, 1)
-            angle = point_number * angle_step
-            x = self.cx + math.cos(angle) * size * pull
-            y = self.cx + math.sin(angle) * size * pull
+            x = self.cx + cos * size * pull
+            y = self.cy + sin * size * pull
             yield Point(x, y)
 
     def spline(self, points: list[Point]) -> Iterator[svg.PathData]:
         """
         https://github.com/georgedoescode/splinejs
         """
+        tension = self.body_tension / 6
         yield svg.MoveTo(*points[-1])
-        first_point = points[0]
-        second_point = points[1]
-        points.insert(0, points[-1])
-        points.insert(0, points[-2])
-        points.append(first_point)
-        points.append(second_point)
-        for p0, p1, p2, p3 in zip(points, points[1:], points[2:], points[3:]):
+        # wrap around, so that each point has two neighbours on both sides
+        points = points[-2:] + points + points[:2]
+        # slide a window of 4 points, unpacking each point only once
+        (x0, y0), (x1, y1), (x2, y2) = points[:3]
+        for x3, y3 in points[3:]:
             yield svg.CubicBezier(
-                x1=p1.x + (p2.x - p0.x) / 6 * self.body_tension,
-                y1=p1.y + (p2.y - p0.y) / 6 * self.body_tension,
-                x2=p2.x - (p3.x - p1.x) / 6 * self.body_tension,
-                y2=p2.y - (p3.y - p1.y) / 6 * self.body_tension,
-                x=p2.x,
-                y=p2.y,
+                x1=x1 + (x2 - x0) * tension,
+                y1=y1 + (y2 - y0) * tension,
+                x2=x2 - (x3 - x1) * tension,
+                y2=y2 - (y3 - y1) * tension,
+                x=x2,
+                y=y2,
             )
+            x0, y0, x1, y1, x2, y2 = x1, y1, x2, y2, x3, y3
 
     def iter_eyes(self, palette: Palette, max_size: int):
         half_size = max_size // 2
@@ -175,6 +198,7 @@ def main() -> None:
     parser.add_argument('--seed', type=int)
     parser.add_argument('--grid-x', type=int, default=1)
     parser.add_argument('--grid-y', type=int, default=1)
+    parser.add_argument('--tile-identical', action='store_true', help='repeat the same blob in every tile')
     args = parser.parse_args()
     if args.seed:
         seed(args.seed)
@@ -184,7 +208,7 @@ def main() -> None:
         line_width=args.line_width,
         body_tension=args.body_tension,
     )
-    print(generator.generate_grid(args.grid_x, args.grid_y))
+    print(generator.generate_grid(args.grid_x, args.grid_y, identical=args.tile_identical))
 
 
 if __name__ == '__main__':
@@ -1,10 +1,11 @@
 from __future__ import annotations
 from argparse import ArgumentParser
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import cached_property
 import math
 from random import randint, random, seed
-from typing import Iterator, NamedTuple
+import sys
+from typing import Iterator, NamedTuple, TextIO
 import svg
 
 
@@ -13,26 +14,41 @@ class Point(NamedTuple):
     y: float
 
     def distance_to(self, p: Point) -> float:
-        dx = abs(self.x - p.x)
-        dy = abs(self.y - p.y)
-        return math.sqrt(dx ** 2 + dy ** 2)
+        dx = self.x - p.x
+        dy = self.y - p.y
+        return math.sqrt(dx * dx + dy * dy)
+
+
+def round_to(value: float, precision: int) -> float:
+    """Round the value, giving an int when no decimal digits are needed.
+    """
+    if precision == 0:
+        return round(value)
+    return round(value, precision)
 
 
 class Circle(NamedTuple):
     c: Point
     r: float
 
-    def render(self, stroke: str = "none", fill: str = "none") -> svg.Element:
+    def render(
+        self, precision: int = 1, stroke: str | None = None, fill: str | None = None,
+    ) -> svg.Element:
         return svg.Circle(
-            cx=self.c.x, cy=self.c.y, r=self.r,
-            stroke=stroke, stroke_width=1,
+            cx=round_to(self.c.x, precision),
+            cy=round_to(self.c.y, precision),
+            r=round_to(self.r, precision),
+            stroke=stroke,
             fill=fill,
         )
 
-    def contains(self, point: Point) -> bool:
-        """Check if the given point is inside the circle
+    def render_str(self, precision: int = 1) -> str:
+        """Unstyled `<circle>` markup, without building an svg.py element.
         """
-        return self.c.distance_to(point) <= self.r
+        cx = round_to(self.c.x, precision)
+        cy = round_to(self.c.y, precision)
+        r = round_to(self.r, precision)
+        return f'<circle cx="{cx}" cy="{cy}" r="{r}"/>'
 
     def min_distance(self, other: Point) -> float:
         """Shortest distance from circle side to the point
@@ -40,6 +56,83 @@ class Circle(NamedTuple):
         return abs(self.r - self.c.distance_to(other))
 
 
+def iter_ring(x: int, y: int, ring: int) -> Iterator[tuple[int, int]]:
+    """Iterate over cells that are exactly `ring` cells away from the given one
+    """
+    if ring == 0:
+        yield x, y
+        return
+    for dx in range(-ring, ring + 1):
+        yield x + dx, y - ring
+        yield x + dx, y + ring
+    for dy in range(-ring + 1, ring):
+        yield x - ring, y + dy
+        yield x + ring, y + dy
+
+
+@dataclass
+class Grid:
+    """Spatial index of circles.
+
+    Every circle is stored in each cell covered by its bounding box,
+    so checking a point needs only the cells around it.
+    Cells keep plain floats (x, y, and r of each circle one after another)
+    to not go through NamedTuple attributes in the hot loops.
+    """
+    cell_size: int
+    cells: dict[tuple[int, int], list[float]] = field(default_factory=dict)
+
+    def cell(self, value: float) -> int:
+        return math.floor(value / self.cell_size)
+
+    def add(self, circle: Circle) -> None:
+        (x, y), r = circle
+        for ix in range(self.cell(x - r), self.cell(x + r) + 1):
+            for iy in range(self.cell(y - r), self.cell(y + r) + 1):
+                self.cells.setdefault((ix, iy), []).extend((x, y, r))
+
+    def contains(self, x: float, y: float) -> bool:
+        """Check if the given point is inside of any circle
+        """
+        values = iter(self.cells.get((self.cell(x), self.cell(y)), ()))
+        for other_x, other_y, other_r in zip(values, values, values):
+            dx = other_x - x
+            dy = other_y - y
+            if dx * dx + dy * dy <= other_r * other_r:
+                return True
+        return False
+
+    def min_distance(self, x: float, y: float, limit: float, cutoff: float = 0) -> float:
+        """Shortest distance from the point to the side of any circle, up to the limit
+
+        Returns early as soon as the distance gets below the cutoff.
+        """
+        sqrt = math.sqrt
+        cell_x = self.cell(x)
+        cell_y = self.cell(y)
+        r = limit
+        ring = 0
+        # cells in the ring are at least (ring - 1) cells away from the point
+        while (ring - 1) * self.cell_size < r:
+            for cell in iter_ring(cell_x, cell_y, ring):
+                values = iter(self.cells.get(cell, ()))
+                for other_x, other_y, other_r in zip(values, values, values):
+                    dx = other_x - x
+                    dy = other_y - y
+                    distance_sq = dx * dx + dy * dy
+                    # the circle side is farther than the limit, skip it without sqrt
+                    reach = other_r + r
+                    if distance_sq >= reach * reach:
+                        continue
+                    distance = abs(other_r - sqrt(distance_sq))
+                    if distance < r:
+                        r = distance
+                        if r < cutoff:
+                            return r
+            ring += 1
+        return r
+
+
 @dataclass
 class Generator:
     size: int
@@ -49,6 +142,7 @@ class Generator:
     min_circles: int
     max_circles: int
     min_radius: int
+    precision: int
 
     def generate(self) -> svg.SVG:
         return svg.SVG(
@@ -58,6 +152,14 @@ class Generator:
             elements=list(self.iter_elements()),
         )
 
+    def write(self, stream: TextIO) -> None:
+        """Write the SVG into the stream as the circles are generated.
+        """
+        stream.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.size}" height="{self.size}">')
+        for element in self.iter_elements_str():
+            stream.write(element)
+        stream.write('</svg>\n')
+
     @cached_property
     def color(self) -> str:
         hue = randint(0, 360)
@@ -79,45 +181,72 @@ class Generator:
         return Circle(c=inner_center, r=r)
 
     def iter_elements(self) -> Iterator[svg.Element]:
-        assert self.inner.r < self.outer.r
-        yield self.outer.render(fill="white")
+        yield self.outer.render(self.precision, fill="white")
+        # all circles share the same style, so set it once on the group
+        yield svg.G(
+            stroke=self.color, stroke_width=1, fill="none",
+            elements=[circle.render(self.precision) for circle in self.iter_circles()],
+        )
+
+    def iter_elements_str(self) -> Iterator[str]:
+        yield str(self.outer.render(self.precision, fill="white"))
+        yield f'<g stroke="{self.color}" stroke-width="1" fill="none">'
+        for circle in self.iter_circles():
+            yield circle.render_str(self.precision)
+        yield '</g>'
 
+    def iter_circles(self) -> Iterator[Circle]:
+        inner = self.inner
+        outer = self.outer
+        assert inner.r < outer.r
         circles_count = randint(self.min_circles, self.max_circles)
-        min_distance = math.ceil(self.inner.min_distance(Point(self.outer.r, self.outer.r)))
-        circles = [self.inner]
+        min_distance = math.ceil(inner.min_distance(outer.c))
+        max_distance = math.floor(outer.r)
+        grid = Grid(cell_size=max(self.min_radius * 2, self.min_width, 1))
         for _ in range(circles_count):
             for _ in range(40):
-                circle = self.get_random_circle(min_distance, circles)
+                circle = self.get_random_circle(
+                    min_distance, max_distance, grid, inner=inner, outer=outer,
+                )
                 if circle is not None:
-                    circles.append(circle)
-                    yield circle.render(stroke=self.color)
+                    grid.add(circle)
+                    yield circle
                     break
 
     def get_random_circle(
-        self, min_distance: int, circles: list[Circle],
+        self, min_distance: int, max_distance: int, grid: Grid, inner: Circle, outer: Circle,
     ) -> Circle | None:
+        (inner_x, inner_y), inner_r = inner
+        (outer_x, outer_y), outer_r = outer
+
         # pick random coordinates for the center
-        distance = randint(min_distance, math.floor(self.outer.r))
+        # the same as randint but without its overhead of going through randrange
+        distance = min_distance + int(random() * (max_distance - min_distance + 1))
         angle = random() * math.pi * 2
-        cx = self.outer.r + math.cos(angle) * distance
-        cy = self.outer.r + math.sin(angle) * distance
+        cx = outer_x + math.cos(angle) * distance
+        cy = outer_y + math.sin(angle) * distance
         assert cx >= 0
         assert cy >= 0
-        center = Point(cx, cy)
 
         # do not draw the circle if the center is inside of another circle
-        for other in circles:
-            if other.contains(center):
-                return None
+        if grid.contains(cx, cy):
+            return None
+        dx = inner_x - cx
+        dy = inner_y - cy
+        if dx * dx + dy * dy <= inner_r * inner_r:
+            return None
 
         # pick radius so the circle touches the closest circle
-        r = self.outer.min_distance(center)
-        for other in circles:
-            r = min(r, other.min_distance(center))
-
+        r = abs(inner_r - math.sqrt(dx * dx + dy * dy))
+        dx = outer_x - cx
+        dy = outer_y - cy
+        r = min(r, abs(outer_r - math.sqrt(dx * dx + dy * dy)))
+        if r < self.min_radius:
+            return None
+        r = grid.min_distance(cx, cy, limit=r, cutoff=self.min_radius)
         if r < self.min_radius:
             return None
-        return Circle(c=center, r=r)
+        return Circle(c=Point(cx, cy), r=r)
 
 
 def main() -> None:
@@ -129,7 +258,9 @@ def main() -> None:
     parser.add_argument('--min-radius', type=int, default=4)
     parser.add_argument('--min-circles', type=int, default=2000)
     parser.add_argument('--max-circles', type=int, default=3000)
+    parser.add_argument('--precision', type=int, default=1, help='decimal digits in coordinates')
     parser.add_argument('--seed', type=int)
+    parser.add_argument('--model', action='store_true', help='render through svg.py elements (slower)')
     args = parser.parse_args()
     if args.seed:
         seed(args.seed)
@@ -141,8 +272,12 @@ def main() -> None:
         min_circles=args.min_circles,
         max_circles=args.max_circles,
         min_radius=args.min_radius,
+        precision=args.precision,
     )
-    print(generator.generate())
+    if args.model:
+        print(generator.generate())
+    else:
+        generator.write(sys.stdout)
 
 
 if __name__ == '__main__':
@@ -1,10 +1,11 @@
 from __future__ import annotations
 from argparse import ArgumentParser
 from dataclasses import dataclass
-from itertools import cycle
-from random import choice
-from typing import Iterator
-import svg
+from functools import cached_property
+from io import StringIO
+from random import Random
+import sys
+from typing import Iterator, TextIO
 
 
 LINE_COLORS = ['red', 'green', 'blue']
@@ -17,49 +18,97 @@ class Generator:
     line_width: int
     radius: int
     circle_color: str
+    use_symbols: bool = False
+    seed: int | None = None
 
-    def generate(self) -> svg.SVG:
-        return svg.SVG(
-            width=self.width,
-            height=self.height,
-            elements=list(self.iter_elements()),
+    @cached_property
+    def rng(self) -> Random:
+        return Random(self.seed)
+
+    @cached_property
+    def overlay_offsets(self) -> tuple[tuple[int, ...], ...]:
+        """For each line color, vertical offsets of the lines over a circle from its center.
+        """
+        r = self.radius
+        step_y = self.line_width * len(LINE_COLORS)
+        return tuple(
+            tuple(range(-r + index * self.line_width, r, step_y))
+            for index in range(len(LINE_COLORS))
         )
 
-    def iter_elements(self) -> Iterator[svg.Element]:
-        # draw horizontal lines on the background
-        colors = cycle(LINE_COLORS)
-        for y in range(0, self.height, self.line_width):
-            yield svg.Rect(
-                x=0, y=y,
-                width=self.width,
-                height=self.line_width,
-                fill=next(colors),
-            )
+    @cached_property
+    def overlay_suffixes(self) -> tuple[str, ...]:
+        """For each line color, the part of a line over a circle that goes after its y.
+        """
+        return tuple(
+            f'" width="{self.radius * 2}" height="{self.line_width}" fill="{color}"/>'
+            for color in LINE_COLORS
+        )
+
+    def generate(self) -> str:
+        stream = StringIO()
+        self.write(stream)
+        return stream.getvalue()
+
+    def write(self, stream: TextIO) -> None:
+        """Write the SVG into the stream chunk by chunk.
+        """
+        stream.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}">')
+        for chunk in self.iter_chunks():
+            stream.write(chunk)
+        stream.write('</svg>\n')
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Generate the SVG body in chunks: the background, and then a column of circles at a time.
+        """
+        width = self.width
+        height = self.height
+        line_width = self.line_width
+
+        # draw horizontal lines on the background as a pattern repeating all colors
+        period_height = line_width * len(LINE_COLORS)
+        stripes = ''.join([
+            f'<rect x="0" y="{index * line_width}" width="{width}" height="{line_width}" fill="{color}"/>'
+            for index, color in enumerate(LINE_COLORS)
+        ])
+        # lines over circles of the same color are all the same, so they can be defined once
+        lines = ''
+        if self.use_symbols:
+            lines = ''.join([
+                f'<g id="lines{index}">{self.draw_lines_over(cx=0, cy=0, index=index)}</g>'
+                for index in range(len(LINE_COLORS))
+            ])
+        yield (
+            f'<defs><pattern id="stripes" width="{width}" height="{period_height}" patternUnits="userSpaceOnUse">'
+            f'{stripes}</pattern>{lines}</defs>'
+            f'<rect x="0" y="0" width="{width}" height="{height}" fill="url(#stripes)"/>'
+        )
 
         # draw the circles
         r = self.radius
-        for cx in range(r * 2, self.width - r, r * 3):
-            for cy in range(r * 2, self.height - r, r * 3):
-                yield svg.Circle(
-                    cx=cx, cy=cy, r=r,
-                    fill=self.circle_color,
-                )
-                yield from self.draw_lines_over(cx=cx, cy=cy)
+        step = r * 3
+        circle_suffix = f'" r="{r}" fill="{self.circle_color}"/>'
+        columns = range(r * 2, width - r, step)
+        rows = range(r * 2, height - r, step)
+        # pick the color of lines over each circle in one go
+        indices = iter(self.rng.choices(range(len(LINE_COLORS)), k=len(columns) * len(rows)))
+        for cx in columns:
+            parts = []
+            append = parts.append
+            for cy, index in zip(rows, indices):
+                append(f'<circle cx="{cx}" cy="{cy}{circle_suffix}')
+                if self.use_symbols:
+                    append(f'<use href="#lines{index}" x="{cx}" y="{cy}"/>')
+                else:
+                    append(self.draw_lines_over(cx=cx, cy=cy, index=index))
+            yield ''.join(parts)
 
     # draw some lines over the circle
-    def draw_lines_over(self, cx: int, cy: int) -> Iterator[svg.Rect]:
-        r = self.radius
-        color = choice(LINE_COLORS)
-        index = LINE_COLORS.index(color)
-        start_y = cy - r + index * self.line_width
-        step_y = self.line_width * len(LINE_COLORS)
-        for y in range(start_y, cy + r, step_y):
-            yield svg.Rect(
-                x=cx-r, y=y,
-                width=r*2,
-                height=self.line_width,
-                fill=color,
-            )
+    def draw_lines_over(self, cx: int, cy: int, index: int) -> str:
+        # all lines over the circle differ only in y
+        prefix = f'<rect x="{cx - self.radius}" y="'
+        suffix = self.overlay_suffixes[index]
+        return ''.join([f'{prefix}{cy + dy}{suffix}' for dy in self.overlay_offsets[index]])
 
 
 def main() -> None:
@@ -69,9 +118,11 @@ def main() -> None:
     parser.add_argument('--line-width', type=int, default=5, help='vertical (oy) size of each stripe')
     parser.add_argument('--radius', type=int, default=60, help='radius of each circle')
     parser.add_argument('--circle-color', type=str, default='#cd7f32')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--use-symbols', action='store_true', help='define lines over circles once and reuse them')
     args = parser.parse_args()
     generator = Generator(**vars(args))
-    print(generator.generate())
+    generator.write(sys.stdout)
 
 
 if __name__ == '__main__':
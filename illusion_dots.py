@@ -1,8 +1,11 @@
 from __future__ import annotations
 from argparse import ArgumentParser
 from dataclasses import dataclass
-from typing import Iterator
-import svg
+from functools import cached_property
+from io import StringIO
+from itertools import product
+import sys
+from typing import Iterator, TextIO
 
 
 LINE_COLORS = ['red', 'green', 'blue']
@@ -15,44 +18,56 @@ class Generator:
     square_size: int
     padding: int
 
-    def generate(self) -> svg.SVG:
-        return svg.SVG(
-            width=self.width,
-            height=self.height,
-            elements=list(self.iter_elements()),
-        )
+    @cached_property
+    def dot_radius(self) -> float:
+        return round(self.padding / (2 ** .5), 2)
+
+    def generate(self) -> str:
+        stream = StringIO()
+        self.write(stream)
+        return stream.getvalue()
+
+    def write(self, stream: TextIO) -> None:
+        """Write the SVG into the stream chunk by chunk.
+        """
+        stream.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}">')
+        for chunk in self.iter_chunks():
+            stream.write(chunk)
+        stream.write('</svg>\n')
+
+    def iter_chunks(self) -> Iterator[str]:
+        """Generate the SVG body in chunks: the background, the squares, and the dots.
+        """
+        width = self.width
+        height = self.height
+        square_size = self.square_size
+        padding = self.padding
 
-    def iter_elements(self) -> Iterator[svg.Element]:
         # grey background
-        yield svg.Rect(
-            x=0, y=0,
-            width=self.width,
-            height=self.height,
-            fill='grey',
-        )
+        yield f'<rect x="0" y="0" width="{width}" height="{height}" fill="grey"/>'
 
         # black squares
-        step = self.square_size + self.padding
-        half_padding = self.padding // 2
-        for x in range(self.padding, self.width - step + half_padding, step):
-            for y in range(self.padding, self.height - step + half_padding, step):
-                yield svg.Rect(
-                    x=x, y=y,
-                    width=self.square_size,
-                    height=self.square_size,
-                    fill='black',
-                )
+        step = square_size + padding
+        half_padding = padding // 2
+        corners = product(
+            range(padding, width - step + half_padding, step),
+            range(padding, height - step + half_padding, step),
+        )
+        yield ''.join([
+            f'<rect x="{x}" y="{y}" width="{square_size}" height="{square_size}" fill="black"/>'
+            for x, y in corners
+        ])
 
         # white circles between squares
-        radius = round(self.padding / (2 ** .5), 2)
-        for x in range(0, self.width, step):
-            for y in range(0, self.height, step):
-                yield svg.Circle(
-                    cx=x + half_padding,
-                    cy=y + half_padding,
-                    r=radius,
-                    fill='white',
-                )
+        radius = self.dot_radius
+        centers = product(
+            range(half_padding, width + half_padding, step),
+            range(half_padding, height + half_padding, step),
+        )
+        yield ''.join([
+            f'<circle cx="{cx}" cy="{cy}" r="{radius}" fill="white"/>'
+            for cx, cy in centers
+        ])
 
 
 def main() -> None:
@@ -63,7 +78,7 @@ def main() -> None:
     parser.add_argument('--padding', type=int, default=10, help='space between squares')
     args = parser.parse_args()
     generator = Generator(**vars(args))
-    print(generator.generate())
+    generator.write(sys.stdout)
 
 
 if __name__ == '__main__':